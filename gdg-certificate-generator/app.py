@@ -1,10 +1,24 @@
 import streamlit as st
 import pandas as pd
 import os
-import shutil
+import tempfile
+import threading
+import time
 import zipfile
+from contextlib import closing
 from io import BytesIO
-from certificate_generator import CertificateGenerator
+from pathlib import Path
+from certificate_generator import CertificateGenerator, VERIFY_BASE_URL
+
+# Longest template side kept after upload (A4 at 300 DPI); larger uploads are scaled down
+MAX_TEMPLATE_DIMENSION = 3508
+
+# Default verification URL for QR codes; set GDG_VERIFY_BASE_URL on the host to preconfigure it
+DEFAULT_VERIFY_BASE_URL = os.environ.get("GDG_VERIFY_BASE_URL", VERIFY_BASE_URL)
+
+# Worker processes per batch; each costs about 290 MB at the template cap, so the
+# default suits Streamlit Cloud (1 CPU, 1 GB). Raise GDG_MAX_WORKERS on larger hosts
+MAX_WORKERS = int(os.environ.get("GDG_MAX_WORKERS", "1"))
 
 # Page configuration
 st.set_page_config(
@@ -13,6 +27,45 @@ st.set_page_config(
     layout="wide"
 )
 
+# Cached across reruns (and sessions) so uploads and fonts are processed once.
+# Each decoded template holds about 78 MB at the size cap, so only a few are kept
+@st.cache_resource(show_spinner=False, max_entries=2, ttl="1h")
+def get_template_generator(template_bytes: bytes) -> CertificateGenerator:
+    """Decode one template, reused across reruns and sessions."""
+    return CertificateGenerator(
+        BytesIO(template_bytes),
+        max_dimension=MAX_TEMPLATE_DIMENSION
+    )
+
+
+def get_generator(template_bytes: bytes, event_name: str, verify_base_url: str) -> CertificateGenerator:
+    """Return a generator for the event, sharing the cached template pixels."""
+    return get_template_generator(template_bytes).for_event(event_name, verify_base_url)
+
+
+@st.cache_resource(show_spinner="Downloading fonts...")
+def prewarm_fonts() -> None:
+    """Fetch every supported font once per server process, in parallel."""
+    CertificateGenerator.prewarm_fonts()
+
+
+@st.cache_data(show_spinner=False)
+def _download_font(font_name: str) -> str:
+    font_path = CertificateGenerator.download_google_font(font_name)
+    if font_path is None:
+        # Raising keeps failed downloads out of the cache so they are retried
+        raise RuntimeError(f"Could not download {font_name} font")
+    return font_path
+
+
+def get_font(font_name: str) -> str:
+    """Return the path of a downloaded Google Font, or None if unavailable."""
+    try:
+        return _download_font(font_name)
+    except RuntimeError:
+        return None
+
+
 # Initialize session state
 if 'template_uploaded' not in st.session_state:
     st.session_state.template_uploaded = False
@@ -39,6 +92,16 @@ with tab1:
         # Event name input
         event_name = st.text_input("Event Name", value="GDG Basra Event", help="This will be used for generating unique hashes")
         
+        # Verification URL encoded in each QR code
+        verify_base_url = st.text_input(
+            "Verification URL",
+            value=DEFAULT_VERIFY_BASE_URL,
+            help="QR codes link here with the certificate ID appended (e.g. https://example.org/verify?h=). "
+                 "Publish the generated manifest.json at this address so certificates can be verified."
+        ).strip() or VERIFY_BASE_URL
+        if verify_base_url == VERIFY_BASE_URL:
+            st.warning("⚠️ The verification URL is still the placeholder, so QR codes will not resolve. Set it to your own verification page.")
+        
         # Template upload
         template_file = st.file_uploader("Choose a certificate template", type=['jpg', 'jpeg', 'png'])
         
@@ -47,12 +110,12 @@ with tab1:
             os.makedirs("temp/uploads", exist_ok=True)
             
             # Save uploaded template
+            template_bytes = template_file.getvalue()
             template_path = os.path.join("temp/uploads", "template.png")
-            with open(template_path, "wb") as f:
-                f.write(template_file.getbuffer())
+            Path(template_path).write_bytes(template_bytes)
             
-            # Initialize generator
-            st.session_state.generator = CertificateGenerator(template_path, event_name)
+            # Initialize generator (cached per template and event name)
+            st.session_state.generator = get_generator(template_bytes, event_name, verify_base_url)
             st.session_state.template_uploaded = True
             st.success("✅ Template uploaded successfully!")
     
@@ -87,14 +150,17 @@ with tab2:
             
             if uploaded_file is not None:
                 try:
-                    # Read file based on type
+                    # Uploaded files persist across reruns, so rewind before reading
+                    uploaded_file.seek(0)
+                    
+                    # Read only the first (names) column as plain strings, skipping type inference
                     if uploaded_file.name.endswith('.csv'):
-                        df = pd.read_csv(uploaded_file)
+                        df = pd.read_csv(uploaded_file, usecols=[0], dtype=str, engine='c', keep_default_na=False)
                     else:
-                        df = pd.read_excel(uploaded_file)
+                        df = pd.read_excel(uploaded_file, usecols=[0], dtype=str, keep_default_na=False)
                     
-                    # Get first column
-                    st.session_state.attendees = df.iloc[:, 0].dropna().astype(str).tolist()
+                    # Blank cells come through as empty strings
+                    st.session_state.attendees = [name for name in df.iloc[:, 0].tolist() if name.strip()]
                     st.success(f"✅ Loaded {len(st.session_state.attendees)} attendees")
                     
                     # Show preview
@@ -125,10 +191,11 @@ with tab3:
             selected_font = st.selectbox("Select Font", available_fonts, help="Fonts will be downloaded from Google Fonts")
             
             # Download font
-            font_path = st.session_state.generator.download_google_font(selected_font)
+            prewarm_fonts()
+            font_path = get_font(selected_font)
             if font_path is None:
                 st.error(f"Could not download {selected_font} font. Please try another.")
-                font_path = st.session_state.generator.download_google_font('Roboto')  # Fallback
+                font_path = get_font('Roboto')  # Fallback
             
             # Font size
             font_size = st.slider("Font Size", min_value=20, max_value=150, value=60, step=5)
@@ -212,12 +279,18 @@ with tab4:
         st.warning("⚠️ Please add attendees first!")
     else:
         st.info(f"Ready to generate {len(st.session_state.attendees)} certificates")
+        if verify_base_url == VERIFY_BASE_URL:
+            st.warning("⚠️ QR codes will point to the placeholder verification URL. Set your own in the 'Upload Template' tab.")
         
         col1, col2 = st.columns([1, 1])
         
         with col1:
             st.subheader("Generation Options")
-            save_format = st.radio("Output Format", ["PDF", "PNG"])
+            save_format = st.radio(
+                "Output Format",
+                ["PDF", "PNG", "Combined PDF"],
+                help="Combined PDF puts every certificate into a single multi-page PDF"
+            )
             
         with col2:
             st.subheader("Summary")
@@ -225,19 +298,28 @@ with tab4:
             st.metric("Event Name", event_name)
         
         if st.button("🚀 Bulk Generate All Certificates", type="primary", use_container_width=True):
+            running = st.session_state.get('batch_thread')
+            if running is not None and running.is_alive():
+                # An interrupted batch is still stopping; never run two at once per session
+                st.warning("⚠️ The previous batch is still stopping. Please try again in a moment.")
+                st.stop()
+            
             progress_bar = st.progress(0)
             status_text = st.empty()
+            st.button("⏹️ Cancel Generation", help="Stops the batch after the certificates in progress")
+            
+            # Each run writes its own archive so a stopping batch never shares a file
+            os.makedirs("temp/output", exist_ok=True)
+            fd, zip_path = tempfile.mkstemp(prefix="certificates_", suffix=".zip", dir="temp/output")
+            os.close(fd)
+            
+            cancel_event = threading.Event()
+            worker = None
             
             try:
-                # Create output directory
-                output_dir = "temp/generated"
-                if os.path.exists(output_dir):
-                    shutil.rmtree(output_dir)
-                os.makedirs(output_dir, exist_ok=True)
-                
                 # Get settings from session state
                 settings = st.session_state.get('settings', {
-                    'font_path': st.session_state.generator.download_google_font('Roboto'),
+                    'font_path': get_font('Roboto'),
                     'font_size': 60,
                     'text_color': (0, 0, 0),
                     'name_position': (st.session_state.generator.template_width//2, st.session_state.generator.template_height//2),
@@ -246,40 +328,66 @@ with tab4:
                     'qr_size': 150
                 })
                 
-                # Generate certificates
-                status_text.text("Generating certificates...")
-                results = st.session_state.generator.batch_generate(
-                    attendees=st.session_state.attendees,
-                    output_dir=output_dir,
-                    name_position=settings['name_position'],
-                    font_path=settings['font_path'],
-                    font_size=settings['font_size'],
-                    text_color=settings['text_color'],
-                    hash_position=settings['hash_position'],
-                    qr_position=settings['qr_position'],
-                    qr_size=settings['qr_size'],
-                    save_as_pdf=(save_format == "PDF")
-                )
+                generator = st.session_state.generator
+                attendees = st.session_state.attendees
+                total = len(attendees)
+                # Shared with the worker thread, which has no access to st.session_state
+                job = {'results': [], 'error': None}
                 
-                progress_bar.progress(50)
+                def run_batch():
+                    try:
+                        # PNG/PDF payloads are already compressed, so store them as-is
+                        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_STORED) as zipf:
+                            batch = generator.batch_generate_iter(
+                                attendees=attendees,
+                                zip_writer=zipf,
+                                name_position=settings['name_position'],
+                                font_path=settings['font_path'],
+                                font_size=settings['font_size'],
+                                text_color=settings['text_color'],
+                                hash_position=settings['hash_position'],
+                                qr_position=settings['qr_position'],
+                                qr_size=settings['qr_size'],
+                                save_as_pdf=(save_format != "PNG"),
+                                max_workers=MAX_WORKERS,
+                                save_mode=('combined_pdf' if save_format == "Combined PDF" else 'per_cert')
+                            )
+                            # Closing the iterator on cancel shuts its process pool down
+                            with closing(batch):
+                                for result in batch:
+                                    job['results'].append(result)
+                                    if cancel_event.is_set():
+                                        break
+                    except Exception as e:
+                        job['error'] = e
+                    finally:
+                        if cancel_event.is_set() and os.path.exists(zip_path):
+                            os.remove(zip_path)
                 
-                # Create ZIP file
-                status_text.text("Creating ZIP file...")
-                zip_path = "temp/output/certificates.zip"
-                os.makedirs("temp/output", exist_ok=True)
+                # Run the batch off the script thread and poll it for per-attendee progress
+                worker = threading.Thread(target=run_batch, daemon=True)
+                st.session_state.batch_thread = worker
+                worker.start()
+                while worker.is_alive():
+                    done = len(job['results'])
+                    progress_bar.progress(int(100 * done / total))
+                    status_text.text(f"Generating certificates... ({done}/{total})")
+                    time.sleep(0.2)
+                worker.join()
                 
-                with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                    for result in results:
-                        zipf.write(result['path'], os.path.basename(result['path']))
+                if job['error'] is not None:
+                    raise job['error']
+                results = job['results']
                 
                 progress_bar.progress(100)
                 status_text.text("✅ Generation complete!")
                 
-                # Download button
+                # Download button; Streamlit still reads the whole archive into memory here,
+                # passing the open file only avoids a second bytes copy in this script
                 with open(zip_path, 'rb') as f:
                     st.download_button(
                         label="📥 Download All Certificates (ZIP)",
-                        data=f.read(),
+                        data=f,
                         file_name=f"gdg_basra_certificates_{event_name.replace(' ', '_').lower()}.zip",
                         mime="application/zip",
                         type="primary",
@@ -301,6 +409,13 @@ with tab4:
                 st.error(f"Error during generation: {e}")
                 import traceback
                 st.error(traceback.format_exc())
+            finally:
+                # Runs on completion and when Streamlit interrupts the script (a widget
+                # was touched, e.g. Cancel): a still-running worker stops and removes its file
+                cancel_event.set()
+                if (worker is None or not worker.is_alive()) and os.path.exists(zip_path):
+                    # Streamlit has already buffered the download, so the archive can go
+                    os.remove(zip_path)
 
 # Footer
 st.markdown("---")